@@ -164,9 +164,12 @@ if __name__ == "__main__":
 #################################################################
 
 import time
+import hashlib
 import requests
 import logging
 import os
+import threading
+from collections import OrderedDict
 from requests.adapters import HTTPAdapter, Retry
 from app.config import settings
 from app.llm.telemetry import (
@@ -175,7 +178,7 @@ from app.llm.telemetry import (
 )
 from app.observability.metrics import estimate_tokens
 from time import perf_counter, sleep 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger("pcp_app")
 
@@ -184,15 +187,25 @@ DEFAULT_TIMEOUT = float(os.getenv("HORIZON_TIMEOUT_SECONDS", "30"))
 RETRY_TOTAL = int(os.getenv("HORIZON_RETRY_TOTAL", "3"))
 RETRY_BACKOFF = float(os.getenv("HORIZON_RETRY_BACKOFF", "0.5"))
 
+# Refresh the bearer token once this fraction of its lifetime has elapsed
+TOKEN_REFRESH_FRACTION = float(os.getenv("HORIZON_TOKEN_REFRESH_FRACTION", "0.75"))
+# After a failed early refresh, wait this long before trying again
+TOKEN_REFRESH_RETRY_SECONDS = float(os.getenv("HORIZON_TOKEN_REFRESH_RETRY_SECONDS", "30"))
+
+# Response cache policy (TTL <= 0 or MAX <= 0 disables the cache)
+RESPONSE_CACHE_TTL = float(os.getenv("HORIZON_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_MAX = int(os.getenv("HORIZON_RESPONSE_CACHE_MAX", "1024"))
+
 verify_val = settings.CA_BUNDLE_PATH if settings.VERIFY_SSL_SOAP else False
 
 # ------------------------------------------------------------------------------
 # Token cache (memory)
 # ------------------------------------------------------------------------------
-_token_cache: Dict[str, Any] = {
-    "access_token": None,
-    "expires_at": 0.0,  # epoch seconds
-}
+# (access_token, expires_at, refresh_at), times in time.monotonic() seconds; refresh
+# proactively after refresh_at. Always replaced as a whole tuple so lock-free readers
+# never pair one token with another token's timestamps.
+_token_state: Tuple[Optional[str], float, float] = (None, 0.0, 0.0)
+_token_lock = threading.Lock()
 
 # Simple in-memory token cache so we don’t call auth on every request
 _member_token_cache: Dict[str, Any] = {
@@ -200,6 +213,42 @@ _member_token_cache: Dict[str, Any] = {
     "expires_at": 0.0,   # epoch seconds
 }
 
+# ------------------------------------------------------------------------------
+# Response cache (memory): identical (system, user) prompts reuse the last answer
+# ------------------------------------------------------------------------------
+_response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _response_cache_key(system_prompt: str, user_prompt: str) -> str:
+    raw = f"{system_prompt}\x00{user_prompt}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _response_cache_get(key: str) -> Optional[str]:
+    """Return a cached Horizon reply if present and not expired (LRU order refreshed)."""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if time.monotonic() >= expires_at:
+            _response_cache.pop(key, None)
+            return None
+        _response_cache.move_to_end(key)
+        return text
+
+
+def _response_cache_put(key: str, text: str) -> None:
+    """Store a Horizon reply, evicting the least recently used entry when full."""
+    if RESPONSE_CACHE_TTL <= 0 or RESPONSE_CACHE_MAX <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, text)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+
 def _auth_endpoint() -> str:
     """Build Horizon OAuth token endpoint."""
     if not settings.HORIZON_GATEWAY:
@@ -217,13 +266,53 @@ def _session_with_retries() -> requests.Session:
         allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 
+def _pooled_session() -> requests.Session:
+    """Pooled requests session without retries, for calls that should fail after one attempt."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared across calls so Horizon requests reuse pooled keep-alive connections.
+# Token requests retry; chat requests don't, so a slow completion costs one timeout at most.
+_horizon_session = _session_with_retries()
+_horizon_chat_session = _pooled_session()
+
+def _extract_content(data: Any) -> Any:
+    """
+    Pull the reply content out of a Horizon chat response.
+    Tries message.content first (Horizon's native shape), then choices[0].message.content,
+    then a top-level 'text' string. Returns None if none are present.
+    """
+    if not isinstance(data, dict):
+        return None
+    msg = data.get("message")
+    if isinstance(msg, dict) and msg.get("content") is not None:
+        return msg["content"]
+    choices = data.get("choices")
+    if choices:
+        content = (choices[0].get("message") or {}).get("content")
+        if content is not None:
+            return content
+    if isinstance(data.get("text"), str):
+        return data["text"]
+    return None
+
+
 def call_horizon(system_prompt: str, user_prompt: str) -> str:   
+    cache_key = _response_cache_key(system_prompt, user_prompt)
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     auth_token = getAuthToken(settings.HORIZON_CLIENT_ID, settings.HORIZON_CLIENT_SECRET, settings.HORIZON_GATEWAY)
     url = f"{settings.HORIZON_CHAT_ENDPOINT}"
 
@@ -245,23 +334,11 @@ def call_horizon(system_prompt: str, user_prompt: str) -> str:
         "stream": False,
     }
     
-    resp = requests.post(url, headers=headers, json=payload, timeout=60, verify=verify_val)
+    resp = _horizon_chat_session.post(url, headers=headers, json=payload, timeout=60, verify=verify_val)
     resp.raise_for_status()
-    data=resp.json()
-    # print(data)
-
-    content = None
-    if isinstance(data, dict):
-        msg = data.get("message")
-        if isinstance(msg, dict):
-            content = msg.get("content")
-
-            if content is None and "choices" in data and data["choices"]:
-                choice = data["choices"][0]
-                m = choice.get("message") or {}
-                content = m.get("content")
-            if content is None and isinstance(data.get("text"), str):
-                content = data["text"]
+    data = resp.json()
+
+    content = _extract_content(data)
 
     if isinstance(content, list):
         content = "".join(
@@ -269,14 +346,13 @@ def call_horizon(system_prompt: str, user_prompt: str) -> str:
             for part in content
         )
 
-    if isinstance(content, str):
-        return content.strip()
-    
     if isinstance(content, str):
         out_text = content.strip()
         if telemetry is not None:
             telemetry["llm_completion_tokens"] = telemetry.get("llm_completion_tokens", 0) + estimate_tokens(out_text)
             telemetry["llm_latency_ms"] = telemetry.get("llm_latency_ms", 0.0) + (perf_counter() - t0) * 1000
+        if out_text:
+            _response_cache_put(cache_key, out_text)
         return out_text
     
     if telemetry is not None:
@@ -287,13 +363,69 @@ def call_horizon(system_prompt: str, user_prompt: str) -> str:
 def getAuthToken(client_id: str, client_secret: str, address: str) -> str:
     """
     Get (and cache) a Horizon Bearer token via client_credentials.
-    - Respects in-memory cache until expiry (with a small safety margin).
+    - Respects in-memory cache until its refresh point (TOKEN_REFRESH_FRACTION of lifetime).
+    - Past the refresh point but before expiry, returns the current token immediately and
+      refreshes it on a background thread; a failed refresh keeps the current token.
+    - Only one caller refreshes at a time; callers block only once the token has expired.
     - Set env HORIZON_VERIFY_SSL to 'false' for dev self-signed, or to a CA bundle path.
     """
-    # If a valid, non-expired token is cached, return it
-    now = time.time()
-    if _token_cache["access_token"] and now < _token_cache["expires_at"] - 10:
-        return _token_cache["access_token"]
+    # Fast path: a cached token that hasn't reached its refresh point
+    cached_token, expires_at, refresh_at = _token_state
+    if cached_token and time.monotonic() < refresh_at:
+        return cached_token
+
+    # Refresh window: hand back the still-valid token and refresh off the request path.
+    # Whoever takes the lock starts the refresh; the background thread releases it.
+    if cached_token and time.monotonic() < expires_at - 10:
+        if _token_lock.acquire(blocking=False):
+            token, _, refresh_at = _token_state
+            if time.monotonic() < refresh_at:
+                # Another caller finished a refresh between our read and the acquire
+                _token_lock.release()
+                return token
+            try:
+                threading.Thread(
+                    target=_refresh_token_in_background,
+                    args=(client_id, client_secret, address),
+                    daemon=True,
+                ).start()
+            except RuntimeError as e:
+                _token_lock.release()
+                logger.warning("Could not start background Horizon token refresh: %s", e)
+        return cached_token
+
+    # Expired (or no token yet): block; re-check under the lock so waiters reuse the winner's token
+    with _token_lock:
+        cached_token, _, refresh_at = _token_state
+        if cached_token and time.monotonic() < refresh_at:
+            return cached_token
+        return _refresh_token(client_id, client_secret, address)
+
+
+def _refresh_token_in_background(client_id: str, client_secret: str, address: str) -> None:
+    """Early refresh run on a daemon thread; releases the _token_lock taken by getAuthToken."""
+    try:
+        _refresh_token(client_id, client_secret, address)
+    except Exception as e:
+        # Request/response failures are handled inside _refresh_token; this covers bad inputs
+        logger.error("Background Horizon token refresh failed: %s", e, exc_info=True)
+    finally:
+        _token_lock.release()
+
+
+def _defer_refresh(now: float) -> None:
+    """Push refresh_at out after a failed early refresh so an outage isn't retried on every call."""
+    global _token_state
+    token, expires_at, _ = _token_state
+    _token_state = (token, expires_at, min(now + TOKEN_REFRESH_RETRY_SECONDS, expires_at - 10))
+
+
+def _refresh_token(client_id: str, client_secret: str, address: str) -> str:
+    """Fetch a new token into _token_state. Caller must hold _token_lock."""
+    global _token_state
+    now = time.monotonic()
+    cached_token, cached_expires_at, _ = _token_state
+    still_valid = bool(cached_token) and now < cached_expires_at - 10
 
     # Validate inputs
     if not address:
@@ -310,10 +442,8 @@ def getAuthToken(client_id: str, client_secret: str, address: str) -> str:
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-    
-    session = _session_with_retries()
     try:
-        resp = session.post(url, data=data, headers=headers, timeout=DEFAULT_TIMEOUT, verify=verify_val)
+        resp = _horizon_session.post(url, data=data, headers=headers, timeout=DEFAULT_TIMEOUT, verify=verify_val)
         resp.raise_for_status()
         payload = resp.json()
 
@@ -322,13 +452,23 @@ def getAuthToken(client_id: str, client_secret: str, address: str) -> str:
         if not access_token:
             raise ValueError(f"Token endpoint missing 'access_token'. Response: {payload}")
 
-        _token_cache["access_token"] = access_token
-        _token_cache["expires_at"] = time.time() + float(expires_in)
+        issued_at = time.monotonic()
+        expires_at = issued_at + float(expires_in)
+        refresh_at = min(issued_at + TOKEN_REFRESH_FRACTION * float(expires_in), expires_at - 10)
+        _token_state = (access_token, expires_at, refresh_at)
         return access_token
 
     except requests.RequestException as e:
+        if still_valid:
+            logger.warning("Horizon token early refresh failed, reusing current token: %s", e)
+            _defer_refresh(now)
+            return cached_token
         logger.error("Horizon token request failed: %s", e, exc_info=True)
         raise
     except ValueError as e:
+        if still_valid:
+            logger.warning("Invalid token response on early refresh, reusing current token: %s", e)
+            _defer_refresh(now)
+            return cached_token
         logger.error("Invalid token response: %s", e, exc_info=True)
         raise
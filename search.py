@@ -6,11 +6,37 @@ import logging
 from typing import Any, Dict, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from config import settings
 
 logger = logging.getLogger("uvicorn.error")
 
 
+def _session_with_retries() -> requests.Session:
+    """
+    Pooled requests session shared by the case REST calls so keep-alive
+    connections are reused instead of paying TCP+TLS setup per call.
+    Only 502/503/504 responses and connection errors are retried (read=0, so a slow
+    response costs one timeout, not four). Retry's default allowed_methods excludes
+    POST, so create_case is not retried.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_http_session = _session_with_retries()
+
+
 def _basic_auth_header(username: str, password: str) -> str:
     """
     Build a Basic Auth header value: 'Basic <base64(username:password)>'.
@@ -20,6 +46,22 @@ def _basic_auth_header(username: str, password: str) -> str:
     return f"Basic {token}"
 
 
+# Resolved once at import instead of on every call
+_GET_CASE_URL = (getattr(settings, "GET_CASE_URL", "") or "").strip()
+_CREATE_CASE_URL = (getattr(settings, "CREATE_CASE_URL", "") or "").strip()
+_VERIFY_SSL_REST = getattr(settings, "VERIFY_SSL_REST", True)
+if str(_VERIFY_SSL_REST).lower() == "false":
+    _VERIFY_SSL_REST = False
+_CASE_HEADERS: Dict[str, str] = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "Authorization": _basic_auth_header(
+        settings.CASE_BASIC_USERNAME,
+        settings.CASE_BASIC_PASSWORD,
+    ),
+}
+
+
 def _strip_px_keys(obj: Any) -> Any:
     """
     Recursively remove any dict keys that start with 'px'.
@@ -45,34 +87,21 @@ def get_case(interaction_id: str) -> Dict[str, Any]:
       - GET request with Content-Type / Accept: application/json
       - Query parameter name is 'interactionId' (change if your API uses a different name)
     """
-    base_url = settings.GET_CASE_URL.rstrip("/")
-    url = f"{base_url}%20{interaction_id}"
-    print("get case url : ", url)
-    if not url:
+    base_url = _GET_CASE_URL.rstrip("/")
+    if not base_url:
         raise RuntimeError("GET_CASE_URL is not configured")
+    url = f"{base_url}%20{interaction_id}"
 
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Authorization": _basic_auth_header(
-            settings.CASE_BASIC_USERNAME,
-            settings.CASE_BASIC_PASSWORD,
-        ),
-    }
-
-    verify = getattr(settings, "VERIFY_SSL_REST", True)
-
-    logger.debug("Calling GET_CASE_URL=%s params=%s", url)
-    resp = requests.get(
+    logger.debug("Calling GET_CASE_URL=%s", url)
+    resp = _http_session.get(
         url,
-        headers=headers,
+        headers=_CASE_HEADERS,
         timeout=30,
-        verify=False if str(verify).lower() == "false" else verify,
+        verify=_VERIFY_SSL_REST,
     )
     logger.debug("get_case(%s) status=%s", interaction_id, resp.status_code)
     resp.raise_for_status()
     data = resp.json() if resp.text else {}
-    print("status code get case : ", resp.status_code)
     # print("get case resp : ", data)
     return data
 
@@ -85,28 +114,18 @@ def create_case(payload: Dict[str, Any]) -> Dict[str, Any]:
       - Basic Auth creds in settings.CASE_BASIC_USERNAME / CASE_BASIC_PASSWORD
       - POST request with JSON body
     """
-    url = (getattr(settings, "CREATE_CASE_URL", "") or "").strip()
+    url = _CREATE_CASE_URL
     if not url:
         raise RuntimeError("CREATE_CASE_URL is not configured")
 
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Authorization": _basic_auth_header(
-            settings.CASE_BASIC_USERNAME,
-            settings.CASE_BASIC_PASSWORD,
-        ),
-    }
-
-    verify = getattr(settings, "VERIFY_SSL_REST", True)
-
-    logger.debug("Calling CREATE_CASE_URL=%s body=%s", url, json.dumps(payload)[:500])
-    resp = requests.post(
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Calling CREATE_CASE_URL=%s body=%s", url, json.dumps(payload)[:500])
+    resp = _http_session.post(
         url,
         json=payload,
-        headers=headers,
+        headers=_CASE_HEADERS,
         timeout=30,
-        verify=False if str(verify).lower() == "false" else verify,
+        verify=_VERIFY_SSL_REST,
     )
 
     logger.debug("create_case status=%s", resp.status_code)
@@ -144,11 +163,11 @@ def sync_case_from_interaction(interaction_id: str) -> Tuple[Dict[str, Any], Dic
 
     # Call create case API
     try:
-        _ = create_case(create_body)
+        create_resp = create_case(create_body)
+        logger.debug("create_case response for interaction_id=%s: %s", interaction_id, create_resp)
     except Exception as e:
         # We don't want this to break the PCP flow; log and re-raise if you prefer.
         logger.error("create_case failed for interaction_id=%s: %s", interaction_id, e, exc_info=True)
         # You can choose to re-raise if failure should stop the flow
         # raise
-    print("Create Case Response : ", _)
     return raw_case, create_body